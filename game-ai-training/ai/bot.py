@@ -72,6 +72,13 @@ class GameBot:
 
         self.model = ActorCritic(state_size, action_size, TRAINING_CONFIG['hidden_size']).to(self.device)
         self.optimizer = optim.Adam(self.model.parameters(), lr=TRAINING_CONFIG['learning_rate'])
+        # act() runs its fixed [1, state_size] forward through ``policy``.
+        # replay() and checkpoints use the eager module: update batches change
+        # size every time, and state_dict keys stay free of compile prefixes.
+        self.policy = self.model
+        if TRAINING_CONFIG.get('compile_model') and hasattr(torch, 'compile'):
+            mode = TRAINING_CONFIG.get('compile_mode', 'reduce-overhead')
+            self.policy = torch.compile(self.model, mode=mode)
 
         self.gamma = TRAINING_CONFIG['gamma']
         self.clip_eps = TRAINING_CONFIG.get('ppo_clip', 0.2)
@@ -99,8 +106,8 @@ class GameBot:
 
     def act(self, state: np.ndarray, valid_actions: List[int]) -> int:
         with self.lock:
-            state_t = torch.FloatTensor(state).unsqueeze(0).to(self.device)
-            logits, value = self.model(state_t)
+            state_t = torch.from_numpy(np.asarray(state, dtype=np.float32)).unsqueeze(0).to(self.device)
+            logits, value = self.policy(state_t)
 
             mask = torch.full_like(logits, float('-inf'))
             for a in valid_actions:
@@ -114,9 +121,12 @@ class GameBot:
             # Store rollout statistics detached from the forward graph.
             # PPO uses these as fixed "old policy/value" references during replay.
             self.last_log_prob = dist.log_prob(action).detach()
-            self.last_entropy = dist.entropy().item()
-            self.last_value = value.squeeze(0).detach()
-            return int(action.item())
+            # Clone: with CUDA graphs the forward output buffer is reused by
+            # the next call, and this value is kept in memory until replay.
+            self.last_value = value.squeeze(0).detach().clone()
+            # Fetch the action and entropy in one device-to-host copy.
+            action_f, self.last_entropy = torch.cat((action.to(logits.dtype), dist.entropy())).tolist()
+            return int(action_f)
 
     def remember(self, state, action, reward, next_state, done, game_won=False, extra_advantage: float = 0.0):
         """Store a transition in memory."""
@@ -143,7 +153,7 @@ class GameBot:
             states, actions, rewards, dones, log_probs, values, entropies, game_wons, extra_advs = zip(*self.memory)
             self.memory = []
 
-            states_t = torch.FloatTensor(np.array(states)).to(self.device)
+            states_t = torch.from_numpy(np.asarray(states, dtype=np.float32)).to(self.device)
             actions_t = torch.LongTensor(actions).to(self.device)
             rewards_t = torch.FloatTensor(rewards).to(self.device)
             dones_t = torch.FloatTensor(dones).to(self.device)
@@ -311,7 +321,7 @@ class DQNBot:
         self.total_reward = 0.0
 
     def act(self, state: np.ndarray, valid_actions: List[int]) -> int:
-        state_t = torch.FloatTensor(state).unsqueeze(0).to(self.device)
+        state_t = torch.from_numpy(np.asarray(state, dtype=np.float32)).unsqueeze(0).to(self.device)
         q_values = self.model(state_t)
 
         mask = torch.full_like(q_values, float('-inf'))
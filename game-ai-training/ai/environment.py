@@ -3,11 +3,12 @@ import subprocess
 import json
 import os
 import time
-import fcntl
 import select
 import threading
-from typing import List, Tuple, Dict, Any, Optional
+from collections import deque
+from typing import List, Tuple, Dict, Any, Optional, NamedTuple, Deque, FrozenSet
 
+from ai.framing import _JSON_ENCODE, _encode_record, encode_frame, decode_frame
 from json_logger import info, error, warning
 from config import (
     HEAVY_REWARD_BASE,
@@ -34,6 +35,7 @@ from config import (
     PARTNER_CAPTURE_NO_HOME_REACH_PENALTY,
     PARTNER_CAPTURE_NEXT_TURN_RISK_PENALTY,
     PARTNER_CAPTURE_NEXT_TURN_SAFE_BONUS,
+    MOVE_HISTORY_MAXLEN,
 )
 
 # Simplified reward system used for initial curriculum training
@@ -53,6 +55,31 @@ EIGHT_CARD_CAPTURE_BONUS = 4.0
 EIGHT_HOME_ENTRY_MULTIPLIER = 4.0
 STUCK_SMART_CARD_DISCARD_PENALTY = -3.0
 STUCK_SMART_CARD_VALUES = {'JOKER', '8', '7'}
+# Per-piece shaping weights resolved once at import so the reward loop in
+# ``step`` does a single load instead of a dict lookup plus arithmetic.
+HOME_ENTRY_PIECE_REWARD = REWARD_WEIGHTS.get('home_entry', 0.0)
+EIGHT_BOOSTED_HOME_ENTRY_REWARD = HOME_ENTRY_PIECE_REWARD * EIGHT_HOME_ENTRY_MULTIPLIER
+SAFE_MOVE_REWARD = REWARD_WEIGHTS.get('safe_move', 1.0)
+CAPTURE_REWARD = REWARD_WEIGHTS.get('capture', 6.0)
+# Progress shaping indexed by steps gained toward the home entrance. Gains
+# beyond five steps earn the full weight.
+HOME_ENTRY_PROGRESS_REWARDS = tuple(
+    REWARD_WEIGHTS.get('home_entry_progress', 2.0) * steps / 5.0 for steps in range(6)
+)
+# Board squares are packed as ``row * BOARD_KEY_STRIDE + col`` for dict keys;
+# the stride only needs to exceed the 19-column board width.
+BOARD_KEY_STRIDE = 32
+
+# Distances to the home entrance from which some forward card (1-7, 9, 10)
+# lands 1-5 squares into the home stretch.
+HOME_ENTRY_REACH_STEPS = frozenset(
+    card - depth for card in (1, 2, 3, 4, 5, 6, 7, 9, 10) for depth in range(1, 6) if card >= depth
+)
+# Observation layout helpers for ``get_state``: one-hot card slots and the
+# eight per-piece feature columns written with a single scatter.
+CARD_VALUES = ('A', '2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'JOKER')
+CARD_VALUE_INDEX = {value: i for i, value in enumerate(CARD_VALUES)}
+PIECE_FEATURE_OFFSETS = np.arange(8)
 
 # The following constants remain for compatibility but do not affect rewards
 HOME_ENTRY_REWARD = 0.0
@@ -85,6 +112,22 @@ def prioritize_home_entry_actions(valid_actions: List[int], home_entry_actions:
     return prioritized or valid_list
 
 
+class PrevInfo(NamedTuple):
+    """Snapshot of one of the acting player's pieces taken before a move.
+
+    ``dist`` holds the steps to the owner's home entrance, or ``-1`` when the
+    piece is not on the outer track.
+    """
+
+    pos: Optional[Dict[str, int]]
+    dist: int
+    in_home: bool
+    in_penalty: bool
+    completed: bool
+    player_id: int
+    within_home_reach: bool
+
+
 class GameEnvironment:
     def __init__(
         self,
@@ -111,12 +154,15 @@ class GameEnvironment:
 
         # store detailed history for debugging
         # each entry will contain the textual move and the full game state
-        self.move_history: List[Dict[str, Any]] = []
+        self.move_history: Deque[Dict[str, Any]] = deque(maxlen=MOVE_HISTORY_MAXLEN)
 
         # background thread to drain Node.js stderr
         self.stderr_thread = None
+        # Bytes read from Node.js stdout that do not yet form a complete line
+        self._stdout_buffer = bytearray()
 
         # Precompute track coordinates and entrance squares for distance checks
+        self._track_rows, self._track_cols = self._generate_track_arrays()
         self._track: List[Dict[str, int]] = self._generate_track()
         self._entrances = [
             {'row': 0, 'col': 4},
@@ -133,6 +179,24 @@ class GameEnvironment:
             {'row': 10, 'col': 0}
         ]
 
+        # Hashed views of the fixed squares above, keyed by ``row * BOARD_KEY_STRIDE
+        # + col`` so lookups hash a small int instead of building a tuple.
+        self._track_lookup: Dict[int, int] = {
+            sq['row'] * BOARD_KEY_STRIDE + sq['col']: i for i, sq in enumerate(self._track)
+        }
+        self._entrance_idx = [self._track_lookup[e['row'] * BOARD_KEY_STRIDE + e['col']] for e in self._entrances]
+        # Square key -> steps to each seat's entrance. The track is fixed, so
+        # every distance query is one dict hit plus a tuple index.
+        track_len = len(self._track)
+        self._entrance_steps: Dict[int, Tuple[int, ...]] = {
+            key: tuple((entrance - idx) % track_len for entrance in self._entrance_idx)
+            for key, idx in self._track_lookup.items()
+        }
+        # Dense 19x19 board grid of track indices (-1 off track) built from the
+        # structure-of-arrays track so many pieces resolve in one gather.
+        self._track_grid = np.full((19, 19), -1, dtype=np.int16)
+        self._track_grid[self._track_rows, self._track_cols] = np.arange(len(self._track))
+
         # Coordinates for each player's home stretch positions
         self._home_stretches = [
             [
@@ -164,6 +228,25 @@ class GameEnvironment:
                 {'row': 14, 'col': 5},
             ],
         ]
+        self._home_lookup: List[Dict[int, int]] = [
+            {sq['row'] * BOARD_KEY_STRIDE + sq['col']: i for i, sq in enumerate(stretch)}
+            for stretch in self._home_stretches
+        ]
+        # Same layout for the home stretches, shape (seats, squares). Stretches
+        # never overlap, so one grid holds the square index and another the
+        # seat that owns it.
+        self._home_rows = np.array([[sq['row'] for sq in st] for st in self._home_stretches], dtype=np.int16)
+        self._home_cols = np.array([[sq['col'] for sq in st] for st in self._home_stretches], dtype=np.int16)
+        self._home_grid = np.full((19, 19), -1, dtype=np.int16)
+        self._home_grid[self._home_rows, self._home_cols] = np.arange(self._home_rows.shape[1])
+        self._home_owner_grid = np.full((19, 19), -1, dtype=np.int16)
+        self._home_owner_grid[self._home_rows, self._home_cols] = np.arange(self._home_rows.shape[0])[:, None]
+        # Seat -> (row, col) of its final home square, the cell that counts as completed.
+        self._home_last_squares: Dict[int, Tuple[int, int]] = {
+            pid: (stretch[-1]['row'], stretch[-1]['col'])
+            for pid, stretch in enumerate(self._home_stretches[:4])
+            if stretch
+        }
 
         # Adjustable reward weight for important plays
         self.heavy_reward = HEAVY_REWARD_BASE
@@ -246,8 +329,6 @@ class GameEnvironment:
 
         # Map from player index to team index
         self.player_team_map: Dict[int, int] = {}
-        # Pending penalties to apply on each player's next move
-        self.pending_penalties = [0.0] * 4
         # Next global turn when no-home penalties should be checked
         self.next_penalty_check = 60
         # Turns since each team last completed a piece
@@ -268,6 +349,21 @@ class GameEnvironment:
         self.last_home_stretch_move_actions: Dict[int, List[int]] = {}
         self.last_fixed_play_actions: Dict[int, List[int]] = {}
         self.last_avoid_actions: Dict[int, List[int]] = {}
+        # Actions the wrapper itself checked for (seat, game_state) in the last
+        # get_valid_actions call. step() trusts them instead of asking Node
+        # again while that exact state object is still current.
+        self._verified_actions: Optional[Tuple[int, Any, FrozenSet[int]]] = None
+        # Seat -> teammates view of ``game_state['teams']``. It is rebuilt only
+        # when a new teams list arrives, so repeated team lookups within a step
+        # (state encoding, threat scans, reward shaping) share one scan.
+        self._teams_source: Optional[List[Any]] = None
+        self._teammates: Dict[int, List[int]] = {}
+        self._team_split_cache: Dict[int, Tuple[List[int], List[int]]] = {}
+        self._opponent_sets: Dict[int, FrozenSet[int]] = {}
+        # Urgency ramp multiplier per turn index. Rebuilt lazily whenever the
+        # turn budget changes so direct ``turn_limit`` assignment stays valid.
+        self._urgency_ramp: Tuple[float, ...] = ()
+        self._urgency_ramp_limit = -1
         # Tracks one-turn 8-card setup opportunities by player. A setup is
         # consumed on that player's next action so it cannot be farmed by
         # repeatedly moving away and back.
@@ -299,56 +395,83 @@ class GameEnvironment:
                 )
             )
         compact.sort()
-        return json.dumps(compact, separators=(',', ':'))
+        return _JSON_ENCODE(compact)
+
+    def _snapshot_state(self) -> Dict[str, Any]:
+        """Copy ``game_state`` for ``move_history`` without a JSON round trip.
+
+        After a response arrives only top-level keys and piece flags are
+        rewritten, so those are copied and other nested values are shared.
+        """
+        snapshot = dict(self.game_state)
+        pieces = snapshot.get('pieces')
+        if isinstance(pieces, list):
+            snapshot['pieces'] = [dict(p) if isinstance(p, dict) else p for p in pieces]
+        return snapshot
+
+    @staticmethod
+    def _generate_track_arrays() -> Tuple[np.ndarray, np.ndarray]:
+        """Replicate the board track coordinates from the Node game as ``(rows, cols)``."""
+        rows = np.concatenate([
+            np.zeros(19, dtype=np.int16),
+            np.arange(1, 19, dtype=np.int16),
+            np.full(18, 18, dtype=np.int16),
+            np.arange(17, 0, -1, dtype=np.int16),
+        ])
+        cols = np.concatenate([
+            np.arange(19, dtype=np.int16),
+            np.full(18, 18, dtype=np.int16),
+            np.arange(17, -1, -1, dtype=np.int16),
+            np.zeros(17, dtype=np.int16),
+        ])
+        return rows, cols
 
     def _generate_track(self) -> List[Dict[str, int]]:
-        """Replicate the board track coordinates from the Node game."""
-        track: List[Dict[str, int]] = []
-        for col in range(19):
-            track.append({'row': 0, 'col': col})
-        for row in range(1, 19):
-            track.append({'row': row, 'col': 18})
-        for col in range(17, -1, -1):
-            track.append({'row': 18, 'col': col})
-        for row in range(17, 0, -1):
-            track.append({'row': row, 'col': 0})
-        return track
+        """Return the track as ``{'row', 'col'}`` dicts built from the coordinate arrays."""
+        return [
+            {'row': row, 'col': col}
+            for row, col in zip(self._track_rows.tolist(), self._track_cols.tolist())
+        ]
 
     def _steps_to_entrance(self, pos: Dict[str, int], player_id: int) -> int:
         """Calculate steps from ``pos`` to the player's home stretch entrance."""
-        entrance = self._entrances[player_id]
-        try:
-            start_idx = next(i for i, p in enumerate(self._track)
-                             if p['row'] == pos['row'] and p['col'] == pos['col'])
-            ent_idx = next(i for i, p in enumerate(self._track)
-                           if p['row'] == entrance['row'] and p['col'] == entrance['col'])
-        except StopIteration:
+        row = pos.get('row')
+        col = pos.get('col')
+        if row is None or col is None:
             return -1
-        return (ent_idx - start_idx + len(self._track)) % len(self._track)
+        steps = self._entrance_steps.get(row * BOARD_KEY_STRIDE + col)
+        if steps is None:
+            return -1
+        return steps[player_id]
 
     def _track_index(self, pos: Dict[str, int]) -> int:
         """Return the index of ``pos`` along the outer track or ``-1``."""
-        for i, square in enumerate(self._track):
-            if square['row'] == pos.get('row') and square['col'] == pos.get('col'):
-                return i
-        return -1
+        row = pos.get('row')
+        col = pos.get('col')
+        if row is None or col is None:
+            return -1
+        return self._track_lookup.get(row * BOARD_KEY_STRIDE + col, -1)
 
     def _home_index(self, pos: Dict[str, int], player_id: int) -> int:
         """Return the index within the player's home stretch or ``-1``."""
-        if not pos or not (0 <= player_id < len(self._home_stretches)):
+        if not pos or not (0 <= player_id < len(self._home_lookup)):
+            return -1
+        row = pos.get('row')
+        col = pos.get('col')
+        if row is None or col is None:
             return -1
-        for i, square in enumerate(self._home_stretches[player_id]):
-            if square['row'] == pos.get('row') and square['col'] == pos.get('col'):
-                return i
-        return -1
+        return self._home_lookup[player_id].get(row * BOARD_KEY_STRIDE + col, -1)
 
     def _in_entry_zone(self, pos: Dict[str, int], player_id: int) -> bool:
         """Return ``True`` if ``pos`` lies within the player's entry zone."""
         steps = self._steps_to_entrance(pos, player_id)
         return 0 <= steps <= 10
 
-    def _within_home_entry_reach(self, piece: Dict[str, Any]) -> bool:
-        """Return whether a piece can enter home stretch with a common forward card."""
+    def _within_home_entry_reach(self, piece: Dict[str, Any], steps_to_entry: Optional[int] = None) -> bool:
+        """Return whether a piece can enter home stretch with a common forward card.
+
+        ``steps_to_entry`` may be passed when the caller already computed it.
+        """
         if (
             piece.get('inPenaltyZone', piece.get('in_penalty'))
             or piece.get('inHomeStretch', piece.get('in_home'))
@@ -358,15 +481,26 @@ class GameEnvironment:
         owner = int(piece.get('playerId', piece.get('player_id', -1)))
         if not (0 <= owner < len(self._entrances)):
             return False
-        pos = piece.get('position') or piece.get('pos') or {}
-        steps_to_entry = self._steps_to_entrance(pos, owner)
-        if steps_to_entry < 0:
-            return False
-        for card_steps in (1, 2, 3, 4, 5, 6, 7, 9, 10):
-            remaining = card_steps - steps_to_entry
-            if 1 <= remaining <= 5:
-                return True
-        return False
+        if steps_to_entry is None:
+            pos = piece.get('position') or piece.get('pos') or {}
+            steps_to_entry = self._steps_to_entrance(pos, owner)
+        return steps_to_entry in HOME_ENTRY_REACH_STEPS
+
+    def _urgency_ramp_value(self, turn_index: int) -> float:
+        """Return the urgency multiplier for ``turn_index`` or ``0`` before the ramp starts."""
+        frac_used = turn_index / max(1.0, float(self.turn_limit))
+        if frac_used < URGENCY_PENALTY_START_FRAC:
+            return 0.0
+        return 1.0 + (frac_used - URGENCY_PENALTY_START_FRAC) / max(1e-6, (1.0 - URGENCY_PENALTY_START_FRAC))
+
+    def _urgency_factor(self, turn_index: int) -> float:
+        """Look up the urgency multiplier, falling back to the formula past the budget."""
+        if self._urgency_ramp_limit != self.turn_limit:
+            self._urgency_ramp = tuple(self._urgency_ramp_value(t) for t in range(max(0, self.turn_limit) + 1))
+            self._urgency_ramp_limit = self.turn_limit
+        if 0 <= turn_index < len(self._urgency_ramp):
+            return self._urgency_ramp[turn_index]
+        return self._urgency_ramp_value(turn_index)
 
     def _is_start_square(self, pos: Dict[str, int], player_id: int) -> bool:
         """Return ``True`` if ``pos`` is the starting square for ``player_id``."""
@@ -379,12 +513,7 @@ class GameEnvironment:
 
     def _count_opponent_near_home(self, pieces: Dict[str, Dict[str, Any]], player_id: int, threshold: int = 10) -> int:
         """Count opponent pieces close to their home stretch entrance."""
-        teams = self.game_state.get('teams', []) if self.game_state else []
-        my_team: List[int] = []
-        for team in teams:
-            if any(pl.get('position') == player_id for pl in team):
-                my_team = [pl.get('position') for pl in team]
-                break
+        my_team = self._teammates_of(player_id)
 
         partner_id = None
         if len(my_team) == 2:
@@ -411,22 +540,21 @@ class GameEnvironment:
         try:
             info("Starting Node.js game process")
             
-            # Start process with unbuffered I/O
+            # Pipes stay in binary mode: commands are encoded and responses
+            # parsed as raw JSON bytes, skipping the text-layer decode.
             self.node_process = subprocess.Popen(
                 ['node', 'game_wrapper.js'],
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
                 cwd='game',
-                bufsize=0  # Unbuffered
             )
 
             # Drain stderr in the background to avoid blocking
             def _drain():
                 try:
-                    for line in iter(self.node_process.stderr.readline, ''):
-                        line = line.strip()
+                    for line in iter(self.node_process.stderr.readline, b''):
+                        line = line.decode('utf-8', errors='replace').strip()
                         if line:
                             info("node stderr", env=self.env_id, msg=line)
                 except Exception as e:
@@ -435,42 +563,32 @@ class GameEnvironment:
             self.stderr_thread = threading.Thread(target=_drain, daemon=True)
             self.stderr_thread.start()
             
-            # Make stdout non-blocking
-            fd = self.node_process.stdout.fileno()
-            fl = fcntl.fcntl(fd, fcntl.F_GETFL)
-            fcntl.fcntl(fd, fcntl.F_SETFL, fl | os.O_NONBLOCK)
-            
+            self._stdout_buffer = bytearray()
+
             # Wait for ready signal
             ready = False
             info("Waiting for ready signal")
-            
-            for attempt in range(50):  # 25 seconds total
-                try:
-                    # Use select to check for available data
-                    ready_fds, _, _ = select.select([self.node_process.stdout], [], [], 0.5)
-                    
-                    if ready_fds:
-                        line = self.node_process.stdout.readline()
-                        if line:
-                            line = line.strip()
-                            info("Received line", snippet=line[:50])  # First 50 chars
-                            
-                            if line.startswith('{'):
-                                try:
-                                    response = json.loads(line)
-                                    if response.get('ready'):
-                                        info("Ready signal received")
-                                        ready = True
-                                        break
-                                except json.JSONDecodeError:
-                                    continue
-                except:
-                    pass
-                
-                # Check if process died
-                if self.node_process.poll() is not None:
-                    error("Node.js process terminated")
-                    return False
+
+            deadline = time.monotonic() + 25.0
+            while True:
+                line = self._read_stdout_line(deadline)
+                if line is None:
+                    break
+                info("Received line", snippet=line[:50].decode('utf-8', errors='replace'))  # First 50 chars
+                if line.startswith(b'{'):
+                    try:
+                        response = decode_frame(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if response.get('ready'):
+                        info("Ready signal received")
+                        ready = True
+                        break
+
+            # Check if process died
+            if not ready and self.node_process.poll() is not None:
+                error("Node.js process terminated")
+                return False
             
             if not ready:
                 error("No ready signal received")
@@ -483,6 +601,31 @@ class GameEnvironment:
             error("Error starting Node.js game", exception=str(e))
             return False
     
+    def _read_stdout_line(self, deadline: float) -> Optional[bytes]:
+        """Return the next complete stdout line, or ``None`` on timeout or EOF.
+
+        Reads go straight to the pipe and are buffered here so responses larger
+        than one pipe chunk are reassembled instead of being split into
+        partial lines.
+        """
+        fd = self.node_process.stdout.fileno()
+        while True:
+            newline = self._stdout_buffer.find(b'\n')
+            if newline >= 0:
+                line = bytes(self._stdout_buffer[:newline]).strip()
+                del self._stdout_buffer[:newline + 1]
+                return line
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            ready_fds, _, _ = select.select([fd], [], [], remaining)
+            if not ready_fds:
+                return None
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                return None
+            self._stdout_buffer += chunk
+
     def send_command(self, command: Dict) -> Dict:
         """Send command to Node.js game and get response"""
         if not self.node_process:
@@ -494,30 +637,22 @@ class GameEnvironment:
         
         try:
             # Send command
-            command_str = json.dumps(command)
-            self.node_process.stdin.write(command_str + '\n')
+            self.node_process.stdin.write(encode_frame(command))
             self.node_process.stdin.flush()
             
-            # Read response with timeout
-            for attempt in range(20):  # 10 seconds total
-                try:
-                    ready_fds, _, _ = select.select([self.node_process.stdout], [], [], 0.5)
-                    
-                    if ready_fds:
-                        line = self.node_process.stdout.readline()
-                        if line:
-                            line = line.strip()
-                            
-                            # Only process JSON lines
-                            if line.startswith('{'):
-                                try:
-                                    return json.loads(line)
-                                except json.JSONDecodeError:
-                                    continue
-                            # Skip non-JSON debug output
-                except:
-                    continue
-            
+            # Read newline-framed responses until one parses or time runs out
+            deadline = time.monotonic() + 10.0
+            while True:
+                line = self._read_stdout_line(deadline)
+                if line is None:
+                    break
+                # Only process JSON lines; skip non-JSON debug output
+                if line.startswith(b'{'):
+                    try:
+                        return decode_frame(line)
+                    except json.JSONDecodeError:
+                        continue
+
             return {"error": "Timeout waiting for response"}
                 
         except Exception as e:
@@ -533,7 +668,7 @@ class GameEnvironment:
         """
         if not self.node_process or self.node_process.poll() is not None:
             if not self.start_node_game():
-                return np.zeros(self.state_size)
+                return np.zeros(self.state_size, dtype=np.float32)
 
         command = {"action": "reset", "pieces": self.pieces_per_player}
         if bot_names:
@@ -547,7 +682,7 @@ class GameEnvironment:
             self.game_state['winningTeam'] = response.get('winningTeam')
             info("Game reset successful")
             # clear previous move history
-            self.move_history = []
+            self.move_history.clear()
             self.reset_reward_events()
             teams = self.game_state.get('teams', [])
             self.player_team_map = {}
@@ -556,7 +691,6 @@ class GameEnvironment:
                     pos = pl.get('position')
                     if pos is not None:
                         self.player_team_map[int(pos)] = idx
-            self.pending_penalties = [0.0] * 4
             self.next_penalty_check = 60
             self.completion_delay_turns = [0] * max(len(teams), 2)
         else:
@@ -564,9 +698,18 @@ class GameEnvironment:
         
         return self.get_state(0)
     
-    def get_state(self, player_id: int) -> np.ndarray:
-        """Convert game state to a richer neural network input."""
-        state = np.zeros(self.state_size)
+    def get_state(self, player_id: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Convert game state to a richer neural network input.
+
+        When ``out`` is given the observation is written into it in place (it
+        must hold ``state_size`` float32 values) and returned, so rollout code
+        can reuse one buffer instead of allocating an array per call.
+        """
+        if out is None:
+            state = np.zeros(self.state_size, dtype=np.float32)
+        else:
+            state = out
+            state.fill(0.0)
         
         if not self.game_state:
             return state
@@ -585,23 +728,22 @@ class GameEnvironment:
             if player_id < len(players):
                 player = players[player_id]
                 cards = player.get('cards', [])
-                
-                card_values = ['A', '2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'JOKER']
-                
-                for i, card in enumerate(cards[:5]):
-                    if 'value' in card and i < 5:
-                        try:
-                            card_idx = card_values.index(card['value'])
-                            base_idx = 12 + i * len(card_values)
-                            if base_idx + card_idx < self.state_size:
-                                state[base_idx + card_idx] = 1
-                        except (ValueError, IndexError):
-                            pass
+                card_slots = [
+                    12 + i * len(CARD_VALUES) + CARD_VALUE_INDEX[card['value']]
+                    for i, card in enumerate(cards[:5])
+                    if card.get('value') in CARD_VALUE_INDEX
+                ]
+                state[card_slots] = 1.0
 
             # Encode complete board pieces (all players).
             pieces = self.game_state.get('pieces', [])
             pieces_start = 100
-            for piece in pieces:
+            owners, track_indices, home_indices = self._board_indices(pieces)
+            threatened, can_capture = self._threat_capture_flags(pieces, owners, track_indices)
+            track_span = max(1, len(self._track) - 1)
+            piece_slots: List[int] = []
+            piece_features: List[Tuple[float, ...]] = []
+            for i, piece in enumerate(pieces):
                 owner = piece.get('playerId', -1)
                 piece_id = piece.get('pieceId', 1)
                 if not (0 <= owner <= 3 and 1 <= piece_id <= 5):
@@ -609,17 +751,21 @@ class GameEnvironment:
                 base = pieces_start + ((owner * 5 + (piece_id - 1)) * 8)
                 if base + 7 >= self.state_size:
                     continue
-                pos = piece.get('position') or {}
-                track_idx = self._track_index(pos)
-                home_idx = self._home_index(pos, owner)
-                state[base] = 1.0 if piece.get('inPenaltyZone') else 0.0
-                state[base + 1] = 1.0 if piece.get('inHomeStretch') else 0.0
-                state[base + 2] = 1.0 if piece.get('completed') else 0.0
-                state[base + 3] = 1.0 if track_idx >= 0 else 0.0
-                state[base + 4] = (track_idx / max(1, len(self._track) - 1)) if track_idx >= 0 else 0.0
-                state[base + 5] = (home_idx / 4.0) if home_idx >= 0 else 0.0
-                state[base + 6] = 1.0 if self._piece_is_threatened(piece) else 0.0
-                state[base + 7] = 1.0 if self._piece_can_capture(piece) else 0.0
+                track_idx = int(track_indices[i])
+                home_idx = int(home_indices[i])
+                piece_slots.append(base)
+                piece_features.append((
+                    1.0 if piece.get('inPenaltyZone') else 0.0,
+                    1.0 if piece.get('inHomeStretch') else 0.0,
+                    1.0 if piece.get('completed') else 0.0,
+                    1.0 if track_idx >= 0 else 0.0,
+                    (track_idx / track_span) if track_idx >= 0 else 0.0,
+                    (home_idx / 4.0) if home_idx >= 0 else 0.0,
+                    1.0 if threatened[i] else 0.0,
+                    1.0 if can_capture[i] else 0.0,
+                ))
+            if piece_slots:
+                state[np.asarray(piece_slots)[:, None] + PIECE_FEATURE_OFFSETS] = piece_features
 
             # Team progress + tactical action metadata.
             counts = self.get_completed_counts()
@@ -640,19 +786,38 @@ class GameEnvironment:
         
         return state
 
+    def _teammates_of(self, player_id: int) -> List[int]:
+        """Return the seats on ``player_id``'s team, or an empty list if it has none."""
+        teams = self.game_state.get('teams', []) if self.game_state else []
+        if teams is not self._teams_source:
+            self._teams_source = teams
+            self._teammates = {}
+            self._team_split_cache = {}
+            self._opponent_sets = {}
+            for team in teams:
+                seats = [pl.get('position') for pl in team if pl.get('position') is not None]
+                for seat in seats:
+                    self._teammates.setdefault(seat, seats)
+        return self._teammates.get(player_id, [])
+
     def _team_split(self, player_id: int) -> Tuple[List[int], List[int]]:
         """Return seat ids for the acting player's team and opponents."""
-        teams = self.game_state.get('teams', []) if self.game_state else []
-        my_team: List[int] = []
-        for team in teams:
-            seats = [pl.get('position') for pl in team if pl.get('position') is not None]
-            if player_id in seats:
-                my_team = seats
-                break
-        if not my_team:
-            my_team = [player_id]
-        opp_team = [pid for pid in range(4) if pid not in my_team]
-        return my_team, opp_team
+        my_team = self._teammates_of(player_id)
+        cached = self._team_split_cache.get(player_id)
+        if cached is None:
+            my_team = my_team or [player_id]
+            cached = (my_team, [pid for pid in range(4) if pid not in my_team])
+            self._team_split_cache[player_id] = cached
+        return cached
+
+    def _opponents_of(self, player_id: int) -> FrozenSet[int]:
+        """Return ``_team_split``'s opponent seats as a set for per-piece membership tests."""
+        self._teammates_of(player_id)
+        opponents = self._opponent_sets.get(player_id)
+        if opponents is None:
+            opponents = frozenset(self._team_split(player_id)[1])
+            self._opponent_sets[player_id] = opponents
+        return opponents
 
     def _piece_is_threatened(self, piece: Dict[str, Any]) -> bool:
         """Approximate whether an opponent can capture this piece soon."""
@@ -660,12 +825,15 @@ class GameEnvironment:
         in_home = piece.get('inHomeStretch', piece.get('in_home'))
         if in_penalty or in_home or piece.get('completed'):
             return False
-        pos = piece.get('position') or {}
+        return self._square_is_threatened(piece.get('position') or {}, piece.get('playerId', -1))
+
+    def _square_is_threatened(self, pos: Dict[str, int], player_id: int) -> bool:
+        """Return ``True`` if an opponent of ``player_id`` sits 1-7 track squares behind ``pos``."""
         idx = self._track_index(pos)
         if idx < 0:
             return False
-        my_team, opp_team = self._team_split(piece.get('playerId', -1))
-        _ = my_team
+        opp_team = self._opponents_of(player_id)
+        track_len = len(self._track)
         for other in self.game_state.get('pieces', []):
             owner = other.get('playerId')
             if owner not in opp_team:
@@ -675,7 +843,7 @@ class GameEnvironment:
             o_idx = self._track_index(other.get('position') or {})
             if o_idx < 0:
                 continue
-            dist = (idx - o_idx + len(self._track)) % len(self._track)
+            dist = (idx - o_idx + track_len) % track_len
             if 1 <= dist <= 7:
                 return True
         return False
@@ -691,8 +859,8 @@ class GameEnvironment:
         idx = self._track_index(pos)
         if idx < 0:
             return False
-        my_team, opp_team = self._team_split(owner)
-        _ = my_team
+        opp_team = self._opponents_of(owner)
+        track_len = len(self._track)
         for other in self.game_state.get('pieces', []):
             if other.get('playerId') not in opp_team:
                 continue
@@ -701,11 +869,71 @@ class GameEnvironment:
             o_idx = self._track_index(other.get('position') or {})
             if o_idx < 0:
                 continue
-            dist = (o_idx - idx + len(self._track)) % len(self._track)
+            dist = (o_idx - idx + track_len) % track_len
             if 1 <= dist <= 7:
                 return True
         return False
 
+    def _board_indices(self, pieces: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return per-piece owners, track indices and own home-stretch indices (``-1`` when absent)."""
+        count = len(pieces)
+        owners = np.full(count, -1, dtype=np.int64)
+        rows = np.full(count, -1, dtype=np.int64)
+        cols = np.full(count, -1, dtype=np.int64)
+        for i, piece in enumerate(pieces):
+            owner = piece.get('playerId', -1)
+            if isinstance(owner, int) and 0 <= owner <= 3:
+                owners[i] = owner
+            pos = piece.get('position') or {}
+            row, col = pos.get('row'), pos.get('col')
+            if isinstance(row, int) and isinstance(col, int) and 0 <= row < 19 and 0 <= col < 19:
+                rows[i] = row
+                cols[i] = col
+        on_board = rows >= 0
+        track_idx = np.full(count, -1, dtype=np.int64)
+        track_idx[on_board] = self._track_grid[rows[on_board], cols[on_board]]
+        home_idx = np.full(count, -1, dtype=np.int64)
+        own_home = on_board & (owners >= 0)
+        own_home[own_home] = self._home_owner_grid[rows[own_home], cols[own_home]] == owners[own_home]
+        home_idx[own_home] = self._home_grid[rows[own_home], cols[own_home]]
+        return owners, track_idx, home_idx
+
+    def _threat_capture_flags(
+        self, pieces: List[Dict[str, Any]], owners: np.ndarray, track_idx: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorised ``_piece_is_threatened``/``_piece_can_capture`` for every piece on the board."""
+        count = len(pieces)
+        # The scalar helpers fall back to snake_case flags for the piece being
+        # scored but not for the pieces it is compared against.
+        self_active = np.zeros(count, dtype=bool)
+        other_active = np.zeros(count, dtype=bool)
+        for i, piece in enumerate(pieces):
+            self_active[i] = not (
+                piece.get('inPenaltyZone', piece.get('in_penalty'))
+                or piece.get('inHomeStretch', piece.get('in_home'))
+                or piece.get('completed')
+            )
+            other_active[i] = not (
+                piece.get('inPenaltyZone') or piece.get('inHomeStretch') or piece.get('completed')
+            )
+        on_track = (owners >= 0) & (track_idx >= 0)
+
+        opponents = np.zeros((4, 4), dtype=bool)
+        for seat in range(4):
+            opponents[seat, self._team_split(seat)[1]] = True
+        seats = np.maximum(owners, 0)
+        pairs = (
+            opponents[seats[:, None], seats[None, :]]
+            & (on_track & self_active)[:, None]
+            & (on_track & other_active)[None, :]
+        )
+        # behind[i, j] is how many squares piece j trails piece i along the track.
+        behind = (track_idx[:, None] - track_idx[None, :]) % len(self._track)
+        threatened = (pairs & (behind >= 1) & (behind <= 7)).any(axis=1)
+        ahead = behind.T
+        can_capture = (pairs & (ahead >= 1) & (ahead <= 7)).any(axis=1)
+        return threatened, can_capture
+
     def _count_active_pieces(self, player_id: int) -> int:
         """Count non-completed pieces that are currently out of penalty."""
         active = 0
@@ -737,7 +965,7 @@ class GameEnvironment:
 
     def _summarize_actions(self, player_id: int) -> Dict[str, float]:
         """Summarize legal actions into normalized metadata features."""
-        actions = list(self.last_valid_actions.get(player_id, []))
+        actions = self.last_valid_actions.get(player_id, [])
         if not actions:
             return {
                 'count': 0.0,
@@ -749,8 +977,13 @@ class GameEnvironment:
                 'safe_ratio': 0.0,
             }
         total = float(len(actions))
-        specials = sum(1 for a in actions if 60 <= a < 70)
-        discards = sum(1 for a in actions if a >= 70)
+        specials = 0
+        discards = 0
+        for a in actions:
+            if a >= 70:
+                discards += 1
+            elif a >= 60:
+                specials += 1
         moves = len(actions) - specials - discards
         return {
             'count': total,
@@ -777,11 +1010,14 @@ class GameEnvironment:
         if not self.game_state:
             return False
 
-        pieces = [
-            piece for piece in self.game_state.get('pieces', [])
-            if piece.get('playerId') == player_id and not piece.get('completed')
-        ]
-        if not pieces or not all(piece.get('inPenaltyZone', piece.get('in_penalty')) for piece in pieces):
+        has_active_piece = False
+        for piece in self.game_state.get('pieces', []):
+            if piece.get('playerId') != player_id or piece.get('completed'):
+                continue
+            if not piece.get('inPenaltyZone', piece.get('in_penalty')):
+                return False
+            has_active_piece = True
+        if not has_active_piece:
             return False
 
         player = None
@@ -800,7 +1036,8 @@ class GameEnvironment:
         """Get valid actions for current player"""
         response = self.send_command({
             "action": "getValidActions",
-            "playerId": player_id
+            "playerId": player_id,
+            "checkValidity": True,
         })
         
         if 'error' in response:
@@ -822,11 +1059,19 @@ class GameEnvironment:
         # when checked individually. The Node wrapper occasionally returns
         # discard actions for cards that no longer exist. Filtering with
         # ``is_action_valid`` prevents the agent from repeatedly sending
-        # impossible moves.
+        # impossible moves. The wrapper runs that check itself when asked via
+        # ``checkValidity`` and returns ``checkedActions``, saving one round
+        # trip per action; older wrappers fall back to checking here.
+        checked = response.get("checkedActions")
         filtered: List[int] = []
-        for act in actions:
-            if 0 <= act < self.action_space_size and self.is_action_valid(player_id, act):
-                filtered.append(act)
+        if checked is not None:
+            filtered = [act for act in checked if 0 <= act < self.action_space_size]
+            if self.game_state is not None:
+                self._verified_actions = (player_id, self.game_state, frozenset(filtered))
+        else:
+            for act in actions:
+                if 0 <= act < self.action_space_size and self.is_action_valid(player_id, act):
+                    filtered.append(act)
 
         if not filtered:
             discard_actions = [a for a in actions if a >= 70]
@@ -849,12 +1094,7 @@ class GameEnvironment:
 
         # Deduplicate while preserving order so the bot only evaluates unique
         # options.
-        unique_actions: List[int] = []
-        seen = set()
-        for act in filtered:
-            if act not in seen:
-                seen.add(act)
-                unique_actions.append(act)
+        unique_actions: List[int] = list(dict.fromkeys(filtered))
 
         valid_action_set = set(unique_actions)
         home_entry_actions = [
@@ -935,6 +1175,16 @@ class GameEnvironment:
             # without also mocking ``is_action_valid``.
             return True
         return bool(response.get("valid"))
+
+    def _is_verified_action(self, player_id: int, action: int) -> bool:
+        """Return whether the wrapper already validated ``action`` for the current state."""
+        verified = self._verified_actions
+        return (
+            verified is not None
+            and verified[0] == player_id
+            and verified[1] is self.game_state
+            and action in verified[2]
+        )
     
     
     def step(
@@ -952,7 +1202,8 @@ class GameEnvironment:
         self.last_step_info = {}
         invalid_attempts = 0
         tried_actions: set = set()
-        prev_pieces: Dict[str, Dict[str, Any]] = {}
+        valid_actions: Optional[List[int]] = None
+        prev_pieces: Dict[str, PrevInfo] = {}
 
         team_idx = self.player_team_map.get(player_id, 0)
         teams = self.game_state.get('teams', []) if self.game_state else []
@@ -962,19 +1213,9 @@ class GameEnvironment:
         home_entry_actions = set(self.last_home_entry_actions.get(player_id, []))
         entry_available_before = bool(home_entry_actions)
 
-        if self.game_state and 'pieces' in self.game_state:
-            for p in self.game_state['pieces']:
-                pid = p.get('playerId')
-                if pid == player_id:
-                    prev_pieces[p['id']] = {
-                        'pos': p.get('position'),
-                        'in_home': p.get('inHomeStretch'),
-                        'in_penalty': p.get('inPenaltyZone'),
-                        'completed': p.get('completed'),
-                        'playerId': pid,
-                        'within_home_reach': self._within_home_entry_reach(p),
-                    }
-
+        # A successful move replaces ``game_state`` wholesale, so this list keeps
+        # the pre-move pieces for the reward diff below.
+        pieces_before = (self.game_state.get('pieces') or ()) if self.game_state else ()
         for pid, count in enumerate(prev_completed_players):
             t_idx = self.player_team_map.get(pid)
             if t_idx is not None and 0 <= t_idx < len(prev_completed):
@@ -987,9 +1228,11 @@ class GameEnvironment:
         # are multiplied by this value below, and defining it here prevents
         # runtime NameError when stepping environments.
         late_game_factor = 1.0
+        # Shared piece-count scale for the time-pressure penalties below.
+        piece_scale = max(1.0, self.pieces_per_player / 2.0)
         # Apply a small per-step time cost so policies are encouraged to finish
         # games efficiently instead of only avoiding hard penalties.
-        step_cost = STEP_PENALTY_BASE * max(1.0, self.pieces_per_player / 2.0)
+        step_cost = STEP_PENALTY_BASE * piece_scale
         weighted_reward += step_cost
         self.reward_event_totals['step_cost'] = (
             self.reward_event_totals.get('step_cost', 0.0) + step_cost
@@ -1004,7 +1247,7 @@ class GameEnvironment:
             long_game_penalty = (
                 LONG_GAME_PENALTY_BASE
                 * float(tiers)
-                * max(1.0, self.pieces_per_player / 2.0)
+                * piece_scale
                 * self.speed_reward_multiplier
             )
             weighted_reward += long_game_penalty
@@ -1012,12 +1255,12 @@ class GameEnvironment:
             self.reward_event_totals['long_game'] += long_game_penalty
         # Ramping urgency penalty near the turn budget to prioritise closing.
         if self.turn_limit > 0:
-            frac_used = turn_index / max(1.0, float(self.turn_limit))
-            if frac_used >= URGENCY_PENALTY_START_FRAC:
+            ramp = self._urgency_factor(turn_index)
+            if ramp > 0:
                 urgency = (
                     URGENCY_PENALTY_BASE
-                    * (1.0 + (frac_used - URGENCY_PENALTY_START_FRAC) / max(1e-6, (1.0 - URGENCY_PENALTY_START_FRAC)))
-                    * max(1.0, self.pieces_per_player / 2.0)
+                    * ramp
+                    * piece_scale
                     * self.speed_reward_multiplier
                 )
                 weighted_reward += urgency
@@ -1028,10 +1271,13 @@ class GameEnvironment:
 
 
         while True:
-            if not self.is_action_valid(player_id, action):
+            if not self._is_verified_action(player_id, action) and not self.is_action_valid(player_id, action):
                 invalid_attempts += 1
                 tried_actions.add(action)
-                valid_actions = self.get_valid_actions(player_id)
+                # Rejected actions leave the board unchanged, so one legal-action
+                # query serves every retry in this step.
+                if valid_actions is None:
+                    valid_actions = self.get_valid_actions(player_id)
                 alt_actions = [a for a in valid_actions if a not in tried_actions]
                 if not alt_actions:
                     discard_actions = [a for a in valid_actions if a >= 70 and a not in tried_actions]
@@ -1072,7 +1318,8 @@ class GameEnvironment:
                 break
 
             invalid_attempts += 1
-            valid_actions = self.get_valid_actions(player_id)
+            if valid_actions is None:
+                valid_actions = self.get_valid_actions(player_id)
             alt_actions = [a for a in valid_actions if a not in tried_actions]
             if not alt_actions:
                 discard_actions = [a for a in valid_actions if a >= 70 and a not in tried_actions]
@@ -1096,6 +1343,24 @@ class GameEnvironment:
         done = response.get('gameEnded', False)
 
         # Invalid moves no longer incur a penalty
+        if response.get('success'):
+            # A rejected move leaves the board unchanged, so the per-piece diff
+            # below only runs when the wrapper accepted an action. Anti-stall,
+            # missed-entry and outcome handling still apply to failed steps.
+            for p in pieces_before:
+                pid = p.get('playerId')
+                if pid == player_id:
+                    pos = p.get('position')
+                    dist = self._steps_to_entrance(pos, pid) if pos else -1
+                    prev_pieces[p['id']] = PrevInfo(
+                        pos=pos,
+                        dist=dist,
+                        in_home=p.get('inHomeStretch'),
+                        in_penalty=p.get('inPenaltyZone'),
+                        completed=p.get('completed'),
+                        player_id=pid,
+                        within_home_reach=self._within_home_entry_reach(p, dist),
+                    )
 
         if 'gameState' in response:
             self.game_state = response['gameState']
@@ -1109,22 +1374,12 @@ class GameEnvironment:
                     summary['heavyRewards'] = self.heavy_reward_events
                 self.game_state['statsSummary'] = summary
             last_move = self.game_state.get('lastMove')
-            if last_move is not None:
-                try:
-                    state_copy = json.loads(json.dumps(self.game_state))
-                except Exception:
-                    state_copy = self.game_state
-                self.move_history.append({'move': str(last_move), 'state': state_copy})
+            if last_move is not None and self.move_history.maxlen != 0:
+                self.move_history.append({'move': str(last_move), 'state': self._snapshot_state()})
 
         teams_now = self.game_state.get('teams', []) if self.game_state else []
-        my_team: List[int] = []
-        opponent_team: List[int] = []
-        for team in teams_now:
-            seats = [pl.get('position') for pl in team if 'position' in pl]
-            if player_id in seats:
-                my_team = seats
-            else:
-                opponent_team.extend(seats)
+        pieces_now = (self.game_state.get('pieces') or ()) if self.game_state else ()
+        my_team = self._teammates_of(player_id)
 
         captures = response.get('captures') or []
         capture_occurred = bool(captures)
@@ -1160,7 +1415,8 @@ class GameEnvironment:
         home_entry_reward = 0.0
         home_entry_piece_ids: List[str] = []
         eight_new_reach_count = 0
-        new_pieces = {p['id']: p for p in self.game_state.get('pieces', [])}
+        eight_setup_piece_id = None
+        new_pieces = {p['id']: p for p in pieces_now}
         for pid, prev in prev_pieces.items():
             new = new_pieces.get(pid)
             if not new:
@@ -1168,28 +1424,36 @@ class GameEnvironment:
             owner = new.get('playerId')
             if owner not in my_team:
                 continue
-            if not prev.get('completed') and new.get('completed'):
+            new_pos = new.get('position')
+            new_in_home = new.get('inHomeStretch')
+            prev_in_home = prev.in_home
+            prev_steps = prev.dist
+            if new_pos == prev.pos:
+                # Most pieces do not move in a turn; reuse the pre-move distance.
+                new_steps = prev_steps
+            else:
+                new_steps = self._steps_to_entrance(new_pos or {}, owner)
+            if not prev.completed and new.get('completed'):
                 piece_reward += PIECE_COMPLETION_REWARD
                 self.reward_event_counts['home_completion'] += 1
                 self.reward_event_totals['home_completion'] += PIECE_COMPLETION_REWARD
                 piece_reward += PIECE_COMPLETION_BONUS
                 self.reward_event_counts['piece_completion_bonus'] += 1
                 self.reward_event_totals['piece_completion_bonus'] += PIECE_COMPLETION_BONUS
-                if seven_split_played and prev.get('in_home'):
+                if seven_split_played and prev_in_home:
                     seven_split_completions += 1
-            entered_home = not prev.get('in_home') and new.get('inHomeStretch')
+            entered_home = not prev_in_home and new_in_home
             if entered_home:
                 home_entry_piece_ids.append(pid)
-                entry_reward = REWARD_WEIGHTS.get('home_entry', 0.0)
+                entry_reward = HOME_ENTRY_PIECE_REWARD
                 pending_setup = self.pending_eight_setups[player_id]
                 if (
                     pending_setup
                     and pending_setup.get('piece_id') == pid
                     and pending_setup.get('from_out_of_reach')
                 ):
-                    boosted_reward = entry_reward * EIGHT_HOME_ENTRY_MULTIPLIER
-                    boost_delta = boosted_reward - entry_reward
-                    entry_reward = boosted_reward
+                    boost_delta = EIGHT_BOOSTED_HOME_ENTRY_REWARD - entry_reward
+                    entry_reward = EIGHT_BOOSTED_HOME_ENTRY_REWARD
                     self.reward_event_counts['eight_home_entry_boost'] += 1
                     self.reward_event_totals['eight_home_entry_boost'] += boost_delta
                 home_entry_reward += entry_reward
@@ -1197,18 +1461,21 @@ class GameEnvironment:
                 self.reward_event_totals['home_entry'] += entry_reward
             if seven_split_played and entered_home:
                 seven_split_home_entries += 1
-            if eight_card_played and not prev.get('within_home_reach') and self._within_home_entry_reach(new):
+            if eight_card_played and not prev.within_home_reach and self._within_home_entry_reach(new, new_steps):
                 eight_new_reach_count += 1
-            prev_steps = self._steps_to_entrance(prev.get('pos') or {}, owner)
-            new_steps = self._steps_to_entrance(new.get('position') or {}, owner)
+                if eight_setup_piece_id is None:
+                    eight_setup_piece_id = pid
             if prev_steps >= 0 and new_steps >= 0 and new_steps < prev_steps:
-                delta = REWARD_WEIGHTS.get('home_entry_progress', 2.0) * min(5, prev_steps - new_steps) / 5.0
-                progress_reward += delta
-            if self._piece_is_threatened({'playerId': owner, **prev}) and not self._piece_is_threatened(new):
-                safe_reward += REWARD_WEIGHTS.get('safe_move', 1.0)
+                progress_reward += HOME_ENTRY_PROGRESS_REWARDS[min(5, prev_steps - new_steps)]
+            was_threatened = (
+                not (prev.in_penalty or prev.in_home or prev.completed)
+                and self._square_is_threatened(prev.pos or {}, owner)
+            )
+            if was_threatened and not self._piece_is_threatened(new):
+                safe_reward += SAFE_MOVE_REWARD
 
         if capture_occurred:
-            cap = REWARD_WEIGHTS.get('capture', 6.0) * late_game_factor
+            cap = CAPTURE_REWARD * late_game_factor
             remaining_capture = max(0.0, CAPTURE_REWARD_CAP - self.reward_event_totals.get('capture', 0.0))
             cap = min(cap, remaining_capture)
             self.reward_event_counts['capture'] += 1
@@ -1227,7 +1494,7 @@ class GameEnvironment:
                     captured_before = prev_pieces.get(captured_id)
                     if not captured_before:
                         continue
-                    if int(captured_before.get('playerId', -1)) != int(partner_id):
+                    if int(captured_before.player_id) != int(partner_id):
                         continue
 
                     partner_capture_events += 1
@@ -1320,14 +1587,8 @@ class GameEnvironment:
                 self.reward_event_totals['eight_card_penalty'] += SMART_CARD_MISUSE_PENALTY
 
         if eight_card_played and eight_new_reach_count > 0:
-            setup_piece_id = None
-            for pid, prev in prev_pieces.items():
-                new = new_pieces.get(pid)
-                if new and not prev.get('within_home_reach') and self._within_home_entry_reach(new):
-                    setup_piece_id = pid
-                    break
             self.pending_eight_setups[player_id] = {
-                'piece_id': setup_piece_id,
+                'piece_id': eight_setup_piece_id,
                 'from_out_of_reach': True,
             }
         else:
@@ -1369,11 +1630,10 @@ class GameEnvironment:
                 self.game_state['winningTeam'] = winner
 
         if done and self.game_state.get('winningTeam'):
-            winning_positions = [pl.get('position') for pl in self.game_state.get('winningTeam', [])]
+            winning_positions = {pl.get('position') for pl in self.game_state.get('winningTeam', [])}
             winning_idx = None
             for idx, team in enumerate(teams_now):
-                team_pos = [pl.get('position') for pl in team if 'position' in pl]
-                if set(team_pos) == set(winning_positions):
+                if {pl.get('position') for pl in team if 'position' in pl} == winning_positions:
                     winning_idx = idx
                     break
             if winning_idx is not None:
@@ -1483,29 +1743,27 @@ class GameEnvironment:
             return
 
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                for entry in self.move_history:
-                    if isinstance(entry, dict):
-                        json.dump(entry, f, ensure_ascii=False)
-                        f.write('\n')
-                    else:
-                        f.write(f"{entry}\n")
+            # Encode every line first and hand the file one buffer, rather than
+            # one ``json.dump`` plus newline write per move.
+            lines = [
+                _encode_record(entry) if isinstance(entry, dict) else str(entry).encode('utf-8')
+                for entry in self.move_history
+            ]
+            with open(filepath, 'wb') as f:
+                f.write(b'\n'.join(lines) + b'\n')
             info("Saved move history", env=self.env_id, file=filepath)
         except Exception as e:
             warning("Failed to save move history", env=self.env_id, file=filepath, error=str(e))
 
     def reset_reward_events(self) -> None:
         """Clear tracked reward event counts."""
-        for key in self.reward_event_counts:
-            self.reward_event_counts[key] = 0
-        for key in self.reward_event_totals:
-            self.reward_event_totals[key] = 0.0
-        for key in self.reward_bonus_totals:
-            self.reward_bonus_totals[key] = 0.0
+        # Rebuilt from the current keys so events added at runtime (e.g. the
+        # trainer's ``timeout``) stay present with a zero value.
+        self.reward_event_counts = dict.fromkeys(self.reward_event_counts, 0)
+        self.reward_event_totals = dict.fromkeys(self.reward_event_totals, 0.0)
+        self.reward_bonus_totals = dict.fromkeys(self.reward_bonus_totals, 0.0)
         self.heavy_reward_events = 0
-        for key in self.heavy_reward_breakdown:
-            self.heavy_reward_breakdown[key] = 0
-        self.pending_penalties = [0.0] * 4
+        self.heavy_reward_breakdown = dict.fromkeys(self.heavy_reward_breakdown, 0)
         self.pending_eight_setups = [None] * 4
         self.near_finish_turns = {}
         self.next_penalty_check = 60
@@ -1550,24 +1808,15 @@ class GameEnvironment:
 
     def sync_local_completion_flags(self) -> None:
         """Ensure pieces on the final home-stretch cell are marked completed."""
-        for pid in range(4):
-            if pid >= len(self._home_stretches):
+        last_squares = self._home_last_squares
+        for piece in self.game_state.get('pieces') or ():
+            last = last_squares.get(piece.get('playerId'))
+            if last is None or piece.get('completed'):
                 continue
-            stretch = self._home_stretches[pid]
-            if not stretch:
-                continue
-            last = stretch[-1]
-            for piece in self.game_state.get('pieces', []):
-                if piece.get('playerId') != pid:
-                    continue
-                pos = piece.get('position') or {}
-                if (
-                    pos.get('row') == last['row']
-                    and pos.get('col') == last['col']
-                    and not piece.get('completed')
-                ):
-                    piece['inHomeStretch'] = True
-                    piece['completed'] = True
+            pos = piece.get('position') or {}
+            if (pos.get('row'), pos.get('col')) == last:
+                piece['inHomeStretch'] = True
+                piece['completed'] = True
 
     def count_completed_pieces(self, player_id: int) -> int:
         """Return how many pieces are fully completed for ``player_id``."""
@@ -1580,9 +1829,14 @@ class GameEnvironment:
 
     def get_completed_counts(self) -> List[int]:
         """Return completed piece counts for all players."""
-        counts = []
-        for pid in range(4):
-            counts.append(self.count_completed_pieces(pid))
+        # One pass over the pieces instead of one ``count_completed_pieces``
+        # scan per seat; this runs several times per step.
+        counts = [0, 0, 0, 0]
+        for p in self.game_state.get('pieces', []):
+            if p.get('completed'):
+                pid = p.get('playerId')
+                if pid is not None and 0 <= pid < 4:
+                    counts[int(pid)] += 1
         return counts
 
     def _check_team_completion(
@@ -0,0 +1,35 @@
+"""JSON codec shared by the Node.js pipe, the bot service and move-history logs."""
+import json
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON when installed
+    orjson = None
+
+# Module-level ``json.dumps`` with keyword arguments builds a fresh encoder on
+# every call, so the stdlib fallback keeps one instance of each.
+_JSON_ENCODE = json.JSONEncoder(separators=(',', ':')).encode
+_JSON_DECODE = json.JSONDecoder().decode
+_JSON_ENCODE_RECORD = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    """Serialise ``message`` as one newline-terminated JSON frame."""
+    if orjson is not None:
+        return orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY) + b'\n'
+    return _JSON_ENCODE(message).encode('utf-8') + b'\n'
+
+
+def decode_frame(line: bytes) -> Any:
+    """Parse one JSON frame; raises ``ValueError`` on malformed input."""
+    if orjson is not None:
+        return orjson.loads(line)
+    return _JSON_DECODE(line.decode('utf-8'))
+
+
+def _encode_record(record: Dict[str, Any]) -> bytes:
+    """Serialise one move-history record as UTF-8 JSON without a trailing newline."""
+    if orjson is not None:
+        return orjson.dumps(record)
+    return _JSON_ENCODE_RECORD(record).encode('utf-8')
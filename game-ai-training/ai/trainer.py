@@ -1,5 +1,7 @@
 import os
 import json
+import math
+import heapq
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
@@ -40,7 +42,7 @@ from config import (
     STAGE5_ROLLBACK_CONFIRM_WINDOWS,
     STAGE5_TURN_LIMIT_BOOST,
 )
-from json_logger import info, warning
+from json_logger import info, warning, is_enabled
 import random
 
 from typing import Optional, Iterable
@@ -403,7 +405,7 @@ class TrainingManager:
         )
         diff = reward - self.reward_mean
         self.reward_var = self.reward_alpha * self.reward_var + (1 - self.reward_alpha) * (diff ** 2)
-        std = max(np.sqrt(self.reward_var), 1e-6)
+        std = max(math.sqrt(self.reward_var), 1e-6)
         return diff / std
 
     def _adjust_ppo_params(self, bot: GameBot, kl: float) -> None:
@@ -576,6 +578,8 @@ class TrainingManager:
         states = [None] * 4
         actions = [None] * 4
         step_records = []
+        # Per-step records only feed the "Top moves" log line.
+        record_steps = is_enabled('INFO')
         
         step_count = 0
         max_steps = self._turn_limit_for_pieces(episode_pieces)
@@ -666,7 +670,8 @@ class TrainingManager:
                             True,
                             team_credit,
                         )
-            step_records.append((abs(step_reward), current_player, action, step_reward))
+            if record_steps:
+                step_records.append((abs(step_reward), current_player, action, step_reward))
             
             # Train bot
             current_bot.step_count += 1
@@ -980,14 +985,15 @@ class TrainingManager:
         self.recent_fixed_team_wins.append(fixed_team_won)
         entropy = self._reward_entropy(env.reward_event_counts)
         self.training_stats['reward_entropies'].append(entropy)
-        event_details = {k: v for k, v in env.reward_event_counts.items()}
-        for k, v in env.reward_event_totals.items():
-            event_details[f"{k}_reward"] = round(v, 2)
-        for k, v in env.reward_bonus_totals.items():
-            event_details[f"{k}_bonus"] = round(v, 2)
-        event_details['heavy_reward_events'] = getattr(env, 'heavy_reward_events', 0)
-        event_details['entropy'] = f"{entropy:.3f}"
-        info("Reward events", **event_details)
+        if is_enabled('INFO'):
+            event_details = {k: v for k, v in env.reward_event_counts.items()}
+            for k, v in env.reward_event_totals.items():
+                event_details[f"{k}_reward"] = round(v, 2)
+            for k, v in env.reward_bonus_totals.items():
+                event_details[f"{k}_bonus"] = round(v, 2)
+            event_details['heavy_reward_events'] = getattr(env, 'heavy_reward_events', 0)
+            event_details['entropy'] = f"{entropy:.3f}"
+            info("Reward events", **event_details)
 
         # Store per-episode reward totals to allow plotting breakdowns later
         self.reward_breakdown_history.append(dict(env.reward_event_totals))
@@ -995,7 +1001,7 @@ class TrainingManager:
         self._update_reward_best_stats(env.reward_event_counts, env.reward_event_totals)
 
         if step_records:
-            top = sorted(step_records, key=lambda x: x[0], reverse=True)[:3]
+            top = heapq.nlargest(3, step_records, key=lambda x: x[0])
             info(
                 "Top moves",
                 moves=[
@@ -1087,13 +1093,15 @@ class TrainingManager:
                     warning("Failed to start Node.js game process")
                     return
 
+            # Episodes spend most of their time blocked on the Node pipes, which
+            # releases the GIL, so one long-lived pool keeps every wrapper busy.
+            executor = ThreadPoolExecutor(max_workers=num_envs)
             try:
                 for episode in range(num_episodes):
                     current_games = int(self.training_stats.get('games_played', 0))
                     for env in self.envs:
                         self._apply_reward_schedule(current_games, env)
-                    with ThreadPoolExecutor(max_workers=num_envs) as executor:
-                        list(executor.map(self.train_episode, self.envs))
+                    list(executor.map(self.train_episode, self.envs))
                     total_games = int(self.training_stats.get('games_played', 0))
 
                     if next_snapshot_at > 0 and total_games >= next_snapshot_at:
@@ -1120,6 +1128,7 @@ class TrainingManager:
                 self.save_models(f"{MODEL_DIR}/final")
 
             finally:
+                executor.shutdown(wait=True)
                 for env in self.envs:
                     env.close()
     
@@ -1191,6 +1200,7 @@ class TrainingManager:
             )
     
     def plot_training_progress(self):
+        """Render training curves for offline inspection; ``train()`` never calls this."""
         fig, axs = plt.subplots(2, 3, figsize=(18, 10))
 
         # Episode rewards
@@ -1231,7 +1241,11 @@ class TrainingManager:
             if bot.losses:
                 window_size = min(100, len(bot.losses))
                 if window_size > 0:
-                    moving_avg = np.convolve(bot.losses, np.ones(window_size)/window_size, mode='valid')
+                    # Prefix sums give the 'valid' moving average in one pass
+                    # instead of np.convolve's O(len * window) work.
+                    csum = np.cumsum(bot.losses, dtype=float)
+                    csum = np.concatenate(([0.0], csum))
+                    moving_avg = (csum[window_size:] - csum[:-window_size]) / window_size
                     color = colors[bot.bot_id % len(colors)]
                     axs[1, 0].plot(moving_avg, label=f'Bot {bot.bot_id}', color=color)
                     has_loss_plots = True
@@ -1269,28 +1283,25 @@ class TrainingManager:
 
         # Reward breakdown stacked bar chart with distinct colors
         if self.reward_breakdown_history:
-            episodes = list(range(len(self.reward_breakdown_history)))
+            num_episodes = len(self.reward_breakdown_history)
+            episodes = list(range(num_episodes))
 
-            combined_history = []
+            # One column per reward key, filled only where an episode has it,
+            # so the work scales with the recorded events rather than E * K.
+            data: dict = {}
+            bonus_history = self.bonus_breakdown_history
             for i, entry in enumerate(self.reward_breakdown_history):
-                combined = dict(entry)
-                if i < len(self.bonus_breakdown_history):
-                    for k, v in self.bonus_breakdown_history[i].items():
-                        combined[k] = combined.get(k, 0.0) + v
-                combined_history.append(combined)
-
-            totals: dict = {}
-            for entry in combined_history:
-                for key, value in entry.items():
-                    totals[key] = totals.get(key, 0) + value
-
+                sources = (entry, bonus_history[i]) if i < len(bonus_history) else (entry,)
+                for source in sources:
+                    for key, value in source.items():
+                        column = data.get(key)
+                        if column is None:
+                            column = data[key] = np.zeros(num_episodes)
+                        column[i] += value
+
+            totals = {k: column.sum() for k, column in data.items()}
             sorted_keys = sorted(totals, key=totals.get, reverse=True)
 
-            data = {k: [] for k in sorted_keys}
-            for entry in combined_history:
-                for k in sorted_keys:
-                    data[k].append(entry.get(k, 0.0))
-
             pos_bottom = np.zeros(len(episodes))
             neg_bottom = np.zeros(len(episodes))
 
@@ -1319,7 +1330,7 @@ class TrainingManager:
                     color_index += 1
 
             for idx, k in enumerate(sorted_keys):
-                values = np.array(data[k])
+                values = data[k]
                 pos_vals = np.where(values > 0, values, 0)
                 neg_vals = np.where(values < 0, values, 0)
 
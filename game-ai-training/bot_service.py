@@ -1,8 +1,8 @@
-import json
 import os
 import sys
 
 from ai.environment import GameEnvironment, prioritize_home_entry_actions
+from ai.framing import encode_frame, decode_frame
 from ai.bot import GameBot, DQNBot
 from json_logger import info
 import torch
@@ -40,13 +40,16 @@ def main():
     model_dir = os.environ.get("BOT_MODEL_DIR", "models/final")
     env, bots = load_bots(model_dir)
 
-    for line in sys.stdin:
+    # Frames stay as bytes end to end, using the same codec as the
+    # training pipe to the Node.js game.
+    out = sys.stdout.buffer
+    for line in sys.stdin.buffer:
         line = line.strip()
         if not line:
             continue
         try:
-            cmd = json.loads(line)
-        except json.JSONDecodeError:
+            cmd = decode_frame(line)
+        except ValueError:
             continue
         if cmd.get("cmd") == "predict":
             env.game_state = cmd.get("gameState", {})
@@ -57,7 +60,8 @@ def main():
             )
             state = env.get_state(pid)
             action = bots[pid].act(state, valid)
-            print(json.dumps({"actionId": action}), flush=True)
+            out.write(encode_frame({"actionId": action}))
+            out.flush()
         elif cmd.get("cmd") == "quit":
             break
 
@@ -19,7 +19,12 @@ TRAINING_CONFIG = {
     # Defaulting to a relatively high value keeps updates infrequent
     # but allows quick overrides in custom configs.
     'update_target_freq': 1000,
-    'lr_final': 7e-6
+    'lr_final': 7e-6,
+    # Wrap the PPO network with torch.compile (PyTorch 2.x). Off by default
+    # since the first calls pay the compilation cost.
+    'compile_model': False,
+    # torch.compile mode; 'reduce-overhead' uses CUDA graphs on GPU.
+    'compile_mode': 'reduce-overhead',
 }
 
 # Piece-dependent entropy regularization. Harder stages use lower entropy so
@@ -40,6 +45,13 @@ LOG_DIR = 'logs'
 # Logging
 import os
 JSON_LOGGING = os.getenv('JSON_LOGGING', '0').lower() in ('1', 'true', 'yes')
+# Lowest level that is emitted: DEBUG, INFO, WARNING, ERROR or OFF.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# Maximum number of moves kept in ``GameEnvironment.move_history`` for match
+# logs. ``None`` keeps the whole game; an integer retains only the latest moves
+# so very long games cannot grow the per-environment snapshot buffer unbounded.
+# ``0`` turns recording off entirely and skips the per-move state snapshot.
+MOVE_HISTORY_MAXLEN = None
 
 # Reward shaping
 # ``HEAVY_REWARD_BASE`` defines the default additional reward granted when a
@@ -106,13 +106,21 @@ class GameWrapper {
                 case 'getValidActions': {
                     const validActions = this.getValidActions(command.playerId);
                     const fixedPlayActions = this.getFixedPlayActions(command.playerId, validActions);
-                    return {
+                    const response = {
                         validActions,
                         homeEntryActions: this.getHomeEntryActions(command.playerId, validActions),
                         homeStretchMoveActions: this.getHomeStretchMoveActions(command.playerId, validActions),
                         fixedPlayActions: fixedPlayActions.priorityActions,
                         avoidActions: fixedPlayActions.avoidActions
                     };
+                    if (command.checkValidity) {
+                        // Run the per-action validity check here so the caller
+                        // does not need one isActionValid round trip per action.
+                        response.checkedActions = validActions.filter(
+                            actionId => this.isActionValid(command.playerId, actionId)
+                        );
+                    }
+                    return response;
                 }
                     
                 case 'makeMove':
@@ -1,7 +1,24 @@
 import json
 from datetime import datetime
 
-from config import JSON_LOGGING
+try:
+    import orjson
+except ImportError:  # optional: faster JSON log lines
+    orjson = None
+
+from config import JSON_LOGGING, LOG_LEVEL
+
+_LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'OFF': 100}
+_THRESHOLD = _LEVELS.get(LOG_LEVEL, _LEVELS['INFO'])
+
+
+def is_enabled(level: str) -> bool:
+    """Return whether records at ``level`` are emitted.
+
+    Callers on hot paths check this first so large keyword arguments are not
+    built or formatted for records that would be dropped.
+    """
+    return _LEVELS.get(level, 0) >= _THRESHOLD
 
 
 def _format_human(level: str, message: str, **kwargs) -> str:
@@ -12,12 +29,25 @@ def _format_human(level: str, message: str, **kwargs) -> str:
     return f"[{timestamp}] [{level}] {message}"
 
 
+def _dumps(entry: dict) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                entry, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            ).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(entry)
+
+
 def log(level: str, message: str, **kwargs):
+    if not is_enabled(level):
+        return
     if JSON_LOGGING:
         entry = {'timestamp': datetime.utcnow().isoformat(),
                  'level': level, 'message': message}
         entry.update(kwargs)
-        print(json.dumps(entry))
+        print(_dumps(entry))
     else:
         print(_format_human(level, message, **kwargs))
 
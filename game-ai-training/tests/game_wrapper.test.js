@@ -475,3 +475,20 @@ describe('GameWrapper fixed play action metadata', () => {
   });
 
 });
+
+describe('GameWrapper getValidActions command', () => {
+  test('returns in-process validity results only when checkValidity is set', () => {
+    const GameWrapper = loadGameWrapper();
+    const wrapper = new GameWrapper();
+    wrapper.setupGame();
+    wrapper.getValidActions = () => [1, 2, 70];
+    wrapper.isActionValid = (playerId, actionId) => actionId !== 2;
+
+    const checked = wrapper.handleCommand({ action: 'getValidActions', playerId: 0, checkValidity: true });
+    const plain = wrapper.handleCommand({ action: 'getValidActions', playerId: 0 });
+
+    expect(checked.validActions).toEqual([1, 2, 70]);
+    expect(checked.checkedActions).toEqual([1, 70]);
+    expect(plain.checkedActions).toBeUndefined();
+  });
+});
@@ -1,6 +1,15 @@
 import sys
+import importlib
+import numpy as np
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+
+# Other tests swap torch for mocks in sys.modules, so keep the real module
+# (when installed) for tests that run actual forward passes.
+try:
+    import torch as real_torch
+except ImportError:  # pragma: no cover - torch is optional for the mocked tests
+    real_torch = None
 
 
 def test_load_model_legacy_error(tmp_path):
@@ -38,3 +47,36 @@ def test_dqn_bot_loads_legacy_checkpoint(tmp_path):
 
     bot = DQNBot(player_id=0, state_size=1, action_size=1)
     bot.load_model(str(tmp_path / 'legacy.pth'))
+
+
+def test_compiled_policy_keeps_remembered_values_across_forwards(monkeypatch):
+    if real_torch is None or not hasattr(real_torch, 'compile'):
+        pytest.skip('requires torch.compile')
+    monkeypatch.setitem(sys.modules, 'torch', real_torch)
+    monkeypatch.setitem(sys.modules, 'torch.nn', real_torch.nn)
+    monkeypatch.setitem(sys.modules, 'torch.optim', real_torch.optim)
+    monkeypatch.delitem(sys.modules, 'ai.bot', raising=False)
+    from config import TRAINING_CONFIG
+    monkeypatch.setitem(TRAINING_CONFIG, 'compile_model', True)
+    monkeypatch.setitem(TRAINING_CONFIG, 'compile_mode', 'default')
+    monkeypatch.setitem(TRAINING_CONFIG, 'hidden_size', 8)
+    monkeypatch.setitem(TRAINING_CONFIG, 'batch_size', 3)
+    bot_module = importlib.import_module('ai.bot')
+
+    bot = bot_module.GameBot(player_id=0, state_size=4, action_size=3, device='cpu')
+    assert bot.policy is not bot.model
+
+    states = np.random.default_rng(0).random((3, 4), dtype=np.float32)
+    stored = []
+    for state in states:
+        bot.act(state, [0, 1, 2])
+        bot.remember(state, 0, 1.0, state, False)
+        stored.append(bot.memory[-1][5].clone())
+
+    for (_, _, _, _, _, value, *_), expected in zip(bot.memory, stored):
+        assert real_torch.equal(value, expected)
+    # Update batches vary in size, so replay stays on the eager module.
+    with patch.object(bot, 'policy', side_effect=AssertionError('replay used the compiled policy')):
+        assert bot.replay() is not None
+    assert bot.memory == []
+    assert not any(k.startswith('_orig_mod') for k in bot.model.state_dict())
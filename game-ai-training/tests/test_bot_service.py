@@ -43,3 +43,28 @@ def test_bot_service_prioritizes_home_entry_actions():
 
     assert prioritize_home_entry_actions([5, 6, 7], [6]) == [6]
     assert prioritize_home_entry_actions([5, 6, 7], [8]) == [5, 6, 7]
+
+
+def test_bot_service_replies_with_one_frame_per_predict():
+    import io
+    import json
+    import bot_service
+
+    env_mock = MagicMock()
+    env_mock.get_state.return_value = [0.0]
+    bot = MagicMock()
+    bot.act.return_value = 6
+    frames = (
+        b'{"cmd": "predict", "playerId": 0, "validActions": [5, 6], "homeEntryActions": [6]}\n'
+        b'not json\n'
+        b'{"cmd": "quit"}\n'
+    )
+    stdin = MagicMock(buffer=io.BytesIO(frames))
+    stdout = MagicMock(buffer=io.BytesIO())
+
+    with patch.object(bot_service, 'load_bots', return_value=(env_mock, [bot] * 4)):
+        with patch.object(bot_service.sys, 'stdin', stdin), patch.object(bot_service.sys, 'stdout', stdout):
+            bot_service.main()
+
+    assert [json.loads(line) for line in stdout.buffer.getvalue().splitlines()] == [{'actionId': 6}]
+    bot.act.assert_called_once_with([0.0], [6])
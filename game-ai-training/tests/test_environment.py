@@ -1,3 +1,7 @@
+import json
+import subprocess
+import sys
+from collections import deque
 import numpy as np
 from unittest.mock import patch
 import pytest
@@ -14,6 +18,7 @@ from ai.environment import (
     SMART_CARD_MISUSE_PENALTY,
     EIGHT_CARD_REACH_REWARD,
     EIGHT_HOME_ENTRY_MULTIPLIER,
+    SAFE_MOVE_REWARD,
 )
 from config import (
     STEP_PENALTY_BASE,
@@ -30,6 +35,7 @@ def test_reset_returns_zero_when_start_fails():
         state = env.reset()
     assert isinstance(state, np.ndarray)
     assert state.shape[0] == env.state_size
+    assert state.dtype == np.float32
     assert np.all(state == 0)
 
 
@@ -770,3 +776,238 @@ def test_get_valid_actions_keeps_avoidable_actions_if_forced():
 
     assert actions == [2]
     assert env.last_avoid_actions[0] == [2]
+
+
+def test_failed_action_keeps_turn_penalties():
+    env = GameEnvironment()
+    step_cost = STEP_PENALTY_BASE * max(1.0, env.pieces_per_player / 2.0)
+    env.game_state = {
+        'pieces': [
+            {
+                'id': 'p0_1',
+                'playerId': 0,
+                'completed': False,
+                'inHomeStretch': False,
+                'inPenaltyZone': False,
+                'position': {'row': 0, 'col': 8},
+            },
+        ],
+        'teams': [[{'position': 0}, {'position': 2}], [{'position': 1}, {'position': 3}]],
+    }
+    env.player_team_map = {0: 0, 2: 0, 1: 1, 3: 1}
+    env.last_home_entry_actions[0] = [1]
+    env.pending_eight_setups[0] = {'piece_id': 'p0_1', 'from_out_of_reach': True}
+    failed_state = dict(env.game_state, turnCount=3)
+    response = {'success': False, 'error': 'Invalid move', 'gameState': failed_state}
+
+    with patch.object(env, 'send_command', return_value=response):
+        with patch.object(env, 'is_action_valid', return_value=True):
+            with patch.object(env, 'get_state', return_value=np.zeros(env.state_size)):
+                _, reward, done = env.step(0, 0)
+
+    assert not done
+    assert reward == pytest.approx(step_cost + MISSED_HOME_ENTRY_PENALTY)
+    assert env.reward_event_counts['missed_home_entry'] == 1
+    assert env.game_state is failed_state
+    assert env.pending_eight_setups[0] is None
+    assert env.no_progress_steps[0]['general'] == 1
+
+
+def test_moving_off_threatened_square_pays_safe_move():
+    env = GameEnvironment()
+    opponent = {'id': 'p1_1', 'playerId': 1, 'completed': False, 'position': {'row': 0, 'col': 2}}
+    env.game_state = {
+        'pieces': [
+            {'id': 'p0_1', 'playerId': 0, 'completed': False, 'position': {'row': 0, 'col': 5}},
+            opponent,
+        ],
+        'teams': [[{'position': 0}, {'position': 2}], [{'position': 1}, {'position': 3}]],
+    }
+    env.player_team_map = {0: 0, 2: 0, 1: 1, 3: 1}
+    new_state = {
+        'pieces': [
+            {'id': 'p0_1', 'playerId': 0, 'completed': False, 'position': {'row': 0, 'col': 12}},
+            dict(opponent),
+        ],
+        'teams': env.game_state['teams'],
+    }
+    response = {'success': True, 'gameState': new_state, 'gameEnded': False, 'winningTeam': None}
+
+    with patch.object(env, 'send_command', return_value=response):
+        with patch.object(env, 'is_action_valid', return_value=True):
+            with patch.object(env, 'get_state', return_value=np.zeros(env.state_size)):
+                env.step(0, 0)
+
+    assert env.reward_event_counts['safe_move'] == 1
+    assert env.reward_event_totals['safe_move'] == pytest.approx(SAFE_MOVE_REWARD)
+
+
+def test_threat_capture_flags_match_scalar_helpers():
+    env = GameEnvironment()
+    rng = np.random.default_rng(7)
+    pieces = []
+    for owner in range(4):
+        for piece_id in range(1, 6):
+            square = env._track[int(rng.integers(len(env._track)))]
+            pieces.append({
+                'id': f'p{owner}_{piece_id}',
+                'playerId': owner,
+                'pieceId': piece_id,
+                'position': dict(square),
+                'inPenaltyZone': bool(rng.random() < 0.2),
+                'inHomeStretch': False,
+                'completed': False,
+            })
+    env.game_state = {
+        'pieces': pieces,
+        'teams': [[{'position': 0}, {'position': 2}], [{'position': 1}, {'position': 3}]],
+    }
+
+    owners, track_idx, _ = env._board_indices(pieces)
+    threatened, can_capture = env._threat_capture_flags(pieces, owners, track_idx)
+
+    assert list(threatened) == [env._piece_is_threatened(p) for p in pieces]
+    assert list(can_capture) == [env._piece_can_capture(p) for p in pieces]
+
+
+def test_urgency_factor_tracks_turn_limit_changes():
+    env = GameEnvironment(turn_limit=100)
+    assert env._urgency_factor(10) == 0.0
+    assert env._urgency_factor(100) == pytest.approx(2.0)
+    assert env._urgency_factor(130) == pytest.approx(3.0)
+
+    env.turn_limit = 200
+    assert env._urgency_factor(100) == 0.0
+    assert env._urgency_factor(200) == pytest.approx(2.0)
+
+
+def test_snapshot_state_isolated_from_later_flag_updates():
+    env = GameEnvironment()
+    env.game_state = {
+        'pieces': [{'id': 'p0_1', 'playerId': 0, 'position': {'row': 5, 'col': 4}, 'completed': False}],
+        'winningTeam': None,
+    }
+
+    snapshot = env._snapshot_state()
+    env.sync_local_completion_flags()
+    env.game_state['winningTeam'] = [{'position': 0}]
+
+    assert snapshot['pieces'][0]['completed'] is False
+    assert snapshot['winningTeam'] is None
+    assert env.game_state['pieces'][0]['completed'] is True
+
+
+def test_get_valid_actions_uses_wrapper_checked_actions():
+    env = GameEnvironment()
+    response = {'validActions': [1, 2, 70], 'checkedActions': [1, 70]}
+
+    with patch.object(env, 'send_command', return_value=response) as send:
+        with patch.object(env, 'is_action_valid') as is_valid:
+            actions = env.get_valid_actions(0)
+
+    assert actions == [1, 70]
+    assert send.call_args[0][0]['checkValidity'] is True
+    is_valid.assert_not_called()
+
+
+def test_send_command_reassembles_responses_larger_than_a_pipe_chunk():
+    env = GameEnvironment()
+    script = (
+        "import json, sys\n"
+        "sys.stdin.readline()\n"
+        "sys.stdout.write('debug output\\n')\n"
+        "sys.stdout.write(json.dumps({'pieces': ['x' * 200000], 'success': True}) + '\\n')\n"
+        "sys.stdout.flush()\n"
+        "sys.stdin.readline()\n"
+    )
+    env.node_process = subprocess.Popen(
+        [sys.executable, '-c', script],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    try:
+        response = env.send_command({'action': 'getValidActions', 'playerId': 0})
+    finally:
+        env.close()
+
+    assert response.get('success') is True
+    assert len(response['pieces'][0]) == 200000
+
+
+def test_get_state_writes_into_caller_buffer():
+    env = GameEnvironment()
+    env.game_state = {
+        'currentPlayerIndex': 1,
+        'teams': [[{'position': 0}, {'position': 2}], [{'position': 1}, {'position': 3}]],
+        'pieces': [],
+    }
+    buffer = np.full(env.state_size, 7.0, dtype=np.float32)
+
+    state = env.get_state(1, out=buffer)
+
+    assert state is buffer
+    np.testing.assert_array_equal(state, env.get_state(1))
+
+
+def test_opponents_of_follows_new_teams_list():
+    env = GameEnvironment()
+    env.game_state = {'teams': [[{'position': 0}, {'position': 2}], [{'position': 1}, {'position': 3}]]}
+    assert env._opponents_of(0) == frozenset({1, 3})
+
+    env.game_state = {'teams': [[{'position': 0}, {'position': 1}], [{'position': 2}, {'position': 3}]]}
+    assert env._opponents_of(0) == frozenset({2, 3})
+
+
+def test_save_history_writes_one_json_line_per_move(tmp_path):
+    env = GameEnvironment()
+    env.move_history.append({'move': 'p0 A', 'state': {'pieces': [], 'note': 'ação'}})
+    env.move_history.append('raw entry')
+    path = tmp_path / 'history.log'
+
+    env.save_history(str(path))
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert json.loads(lines[0]) == {'move': 'p0 A', 'state': {'pieces': [], 'note': 'ação'}}
+    assert lines[1] == 'raw entry'
+    assert len(lines) == 2
+
+
+def test_step_skips_validity_round_trip_for_wrapper_checked_action():
+    env = GameEnvironment()
+    env.game_state = {
+        'pieces': [],
+        'teams': [[{'position': 0}, {'position': 2}], [{'position': 1}, {'position': 3}]],
+    }
+    env.player_team_map = {0: 0, 2: 0, 1: 1, 3: 1}
+    calls = []
+
+    def _send(cmd):
+        calls.append(cmd['action'])
+        if cmd['action'] == 'getValidActions':
+            return {'validActions': [1, 70], 'checkedActions': [1, 70]}
+        return {'success': True, 'gameState': {'pieces': [], 'teams': env.game_state['teams']}}
+
+    with patch.object(env, 'send_command', side_effect=_send):
+        with patch.object(env, 'get_state', return_value=np.zeros(env.state_size)):
+            env.get_valid_actions(0)
+            env.step(1, 0)
+            env.step(70, 0)
+
+    # The second step runs against the new state, so it asks Node again.
+    assert calls == ['getValidActions', 'makeMove', 'isActionValid', 'makeMove']
+
+
+def test_zero_length_move_history_skips_snapshots():
+    env = GameEnvironment()
+    env.move_history = deque(maxlen=0)
+    env.game_state = {'pieces': [], 'teams': [[{'position': 0}, {'position': 2}], [{'position': 1}, {'position': 3}]]}
+    env.player_team_map = {0: 0, 2: 0, 1: 1, 3: 1}
+    response = {'success': True, 'gameState': {'pieces': [], 'teams': env.game_state['teams'], 'lastMove': 'p0 A'}}
+
+    with patch.object(env, 'send_command', return_value=response):
+        with patch.object(env, 'is_action_valid', return_value=True):
+            with patch.object(env, '_snapshot_state') as snapshot:
+                with patch.object(env, 'get_state', return_value=np.zeros(env.state_size)):
+                    env.step(0, 0)
+
+    snapshot.assert_not_called()